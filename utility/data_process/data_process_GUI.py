@@ -1,9 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
 from nptdms import TdmsFile
-import json
 import data_process_main as dpm
-from multiprocessing import Pool, cpu_count
 import os
 
 class DataProcessGUI:
@@ -301,13 +299,14 @@ class DataProcessGUI:
             self.root.update()  # Force GUI update
             
             # Load config
-            with open(config_path) as f:
-                config = json.load(f)
+            config = dpm.load_config(config_path)
             
             # Process requirements
-            with Pool(processes=cpu_count()) as pool:
-                dpm.tdms_file = TdmsFile(tdms_path)
-                results = pool.map(dpm.process_requirement, config["test_requirements"])
+            with TdmsFile.open(tdms_path) as tdms_file:
+                dpm.tdms_file = tdms_file
+                dpm.channel_cache.clear()
+                results = dpm.process_requirements(config["test_requirements"])
+            dpm.tdms_file = None
             
             # Update results display
             pass_count = sum(1 for _, _, r in results if isinstance(r, tuple) and r[0])
@@ -1,13 +1,39 @@
-from scipy import interpolate
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from scipy import signal
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+logger = logging.getLogger(__name__)
+
+# Shared worker pool for batched measurements (NumPy releases the GIL)
+_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Memoized results keyed on the arrays they were computed from, see _cached.
+# Holds threshold crossings, time axis layouts, block tables and window
+# statistics; sized for all of them together.
+_CACHE_SIZE = 256
+_cache = {}
+
+# Samples scanned per step when searching for a threshold crossing
+_CROSS_CHUNK = 1 << 16
+
+# Channels at least this long get a block max/min table, see _range_extremum
+_BLOCK_MIN_LEN = 1 << 16
 
 def result_check(value, low_limit=None, high_limit=None):
     """
-    Generic function to check if value is within limits
+    Generic function to check if value is within limits.
+    A NaN value (e.g. from an empty or invalid window) fails the check.
     """
     if value is None:
         return False, None
+    if value != value:
+        return False, value
         
     if low_limit is not None and value < low_limit:
         return False, value
@@ -16,23 +42,180 @@ def result_check(value, low_limit=None, high_limit=None):
         
     return True, value
 
-def max_check(x_data, y_data, time_begin=None, time_end=None):
+def result_check_batch(values, low_limits, high_limits):
     """
-    Find max value in specified range
+    result_check over parallel sequences of values and limits with one
+    vectorized comparison. Returns a list of (pass_fail, value) pairs,
+    None and NaN values fail as in result_check.
     """
-    # Find indices for the specified time range
+    vals = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    lows = np.array([-np.inf if v is None else v for v in low_limits], dtype=np.float64)
+    highs = np.array([np.inf if v is None else v for v in high_limits], dtype=np.float64)
+    # Written as "not outside the limits" so NaN limits behave like result_check
+    passes = ~np.isnan(vals) & ~(vals < lows) & ~(vals > highs)
+    return [(bool(p), v) for p, v in zip(passes, values)]
+
+def _cached(kind, arrays, args, compute):
+    """
+    Memoize compute() for the given arrays and extra key args, so work on the
+    same channel (e.g. freq and DutyCycle on one window) is done once.
+    kind tags what is stored, arrays is a tuple of the inputs.
+    """
+    key = (kind,) + tuple(id(a) for a in arrays) + args
+    cached = _cache.get(key)
+    if cached is not None and all(c is a for c, a in zip(cached[0], arrays)):
+        return cached[1]
+    
+    result = compute()
+    if len(_cache) >= _CACHE_SIZE:
+        _cache.clear()
+    # Keep the arrays referenced so their ids can't be reused while cached
+    _cache[key] = (arrays, result)
+    return result
+
+def _uniform_params(x_data):
+    """
+    Return (x0, dt) if the time axis is uniformly sampled, otherwise None.
+    Checked once per time channel; later calls reuse the stored layout.
+    """
+    def layout():
+        n = len(x_data)
+        if n >= 4:
+            x0 = float(x_data[0])
+            dt = float(x_data[1]) - x0
+            if dt > 0 and np.allclose(np.diff(x_data[:4]), dt) and np.isclose(x_data[-1], x0 + (n - 1) * dt):
+                return x0, dt
+        return None
+    
+    return _cached("layout", (x_data,), (), layout)
+
+def _first_index(x_data, value, strict=False, ux=None):
+    """
+    Index of the first sample >= value (> value if strict), len(x_data) if none
+    """
+    n = len(x_data)
+    if ux is not None and np.isfinite(value):
+        # Compute the index directly, then step over any rounding error
+        x0, dt = ux
+        idx = min(max(int(np.ceil((value - x0) / dt)), 0), n)
+        while idx > 0 and (x_data[idx-1] > value if strict else x_data[idx-1] >= value):
+            idx -= 1
+        while idx < n and not (x_data[idx] > value if strict else x_data[idx] >= value):
+            idx += 1
+        return idx
+    # Time axis is monotonic, so a binary search replaces the linear scan.
+    # Also handles infinite and NaN bounds, which have no direct index.
+    return int(np.searchsorted(x_data, value, side='right' if strict else 'left'))
+
+def _range_indices(x_data, time_begin=None, time_end=None, ux=None):
+    """
+    Find start/end indices of the specified time range.
+    ux is the (x0, dt) pair from _uniform_params; it is detected when not given.
+    """
+    if ux is None:
+        ux = _uniform_params(x_data)
     start_idx = 0
     end_idx = len(x_data)
     
     if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
+        start_idx = _first_index(x_data, time_begin, ux=ux)
+        if start_idx == len(x_data):  # No sample after time_begin, keep whole range
+            start_idx = 0
     if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+        end_idx = _first_index(x_data, time_end, strict=True, ux=ux)
+    
+    return start_idx, end_idx
+
+def _minmax_kernel(y_slice):
+    """Min and max of a non-empty array in one pass, NaN propagates like np.min/np.max"""
+    lo = y_slice[0]
+    hi = y_slice[0]
+    for v in y_slice:
+        if v != v:
+            return v, v
+        if v < lo:
+            lo = v
+        elif v > hi:
+            hi = v
+    return lo, hi
+
+if njit is not None:
+    _minmax_kernel = njit(cache=True, nogil=True)(_minmax_kernel)
+
+def _minmax(y_slice):
+    """
+    Min and max of y_slice, fused into one pass over the data when numba
+    is available
+    """
+    if njit is None or len(y_slice) == 0:
+        return np.min(y_slice), np.max(y_slice)
+    return _minmax_kernel(y_slice)
+
+def _block_extrema(y_data, find_max):
+    """
+    Block size, per-block extremum values and their indices for y_data,
+    built once per channel with blocks of sqrt(N) samples.
+    Only whole blocks are covered, the tail is handled as a suffix run.
+    """
+    def build():
+        block = max(int(np.sqrt(len(y_data))), 1)
+        n_blocks = len(y_data) // block
+        blocks = y_data[:n_blocks * block].reshape(n_blocks, block)
+        arg = blocks.argmax(axis=1) if find_max else blocks.argmin(axis=1)
+        values = blocks[np.arange(n_blocks), arg]
+        indices = arg + np.arange(n_blocks) * block
+        return block, values, indices
+    
+    return _cached("blocks", (y_data,), (find_max,), build)
+
+def _range_extremum(y_data, start_idx, end_idx, find_max):
+    """
+    Max (or min) of y_data[start_idx:end_idx] and the index of its first
+    occurrence. Long channels answer from the block table, so repeated
+    windows on the same channel only rescan the partial blocks at the ends.
+    """
+    # Whole blocks inside the window, sized as in _block_extrema, so short
+    # windows never pay for building the table
+    block = max(int(np.sqrt(len(y_data))), 1)
+    first = -(-start_idx // block)
+    last = min(end_idx // block, len(y_data) // block)
+    pick = np.argmax if find_max else np.argmin
+    if len(y_data) < _BLOCK_MIN_LEN or last - first < 2:
+        # One argmax/argmin pass, the value is read back at its index
+        y_slice = y_data[start_idx:end_idx]
+        k = int(pick(y_slice))
+        return y_slice[k], start_idx + k
+    
+    block, values, indices = _block_extrema(y_data, find_max)
+    # Candidates in sample order so ties resolve to the first occurrence
+    cand_values = []
+    cand_indices = []
+    prefix = y_data[start_idx:first * block]
+    if len(prefix):
+        k = pick(prefix)
+        cand_values.append(prefix[k])
+        cand_indices.append(start_idx + k)
+    k = first + pick(values[first:last])
+    cand_values.append(values[k])
+    cand_indices.append(indices[k])
+    suffix = y_data[last * block:end_idx]
+    if len(suffix):
+        k = pick(suffix)
+        cand_values.append(suffix[k])
+        cand_indices.append(last * block + k)
+    
+    j = pick(np.array(cand_values))
+    return cand_values[j], int(cand_indices[j])
+
+def max_check(x_data, y_data, time_begin=None, time_end=None):
+    """
+    Find max value in specified range
+    """
+    # Find indices for the specified time range
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
     # Get the max value and its index in the specified range
-    y_slice = y_data[start_idx:end_idx]
-    max_value = y_slice.max()
-    max_idx = start_idx + y_slice.argmax()
+    max_value, max_idx = _range_extremum(y_data, start_idx, end_idx, True)
     x_at_max = x_data[max_idx]
     
     return max_value, x_at_max
@@ -47,18 +230,10 @@ def min_check(x_data, y_data, time_begin=None, time_end=None):
     Find min value in specified range
     """
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
     # Get the min value and its index in the specified range
-    y_slice = y_data[start_idx:end_idx]
-    min_value = y_slice.min()
-    min_idx = start_idx + y_slice.argmin()
+    min_value, min_idx = _range_extremum(y_data, start_idx, end_idx, False)
     x_at_min = x_data[min_idx]
     
     return min_value, x_at_min
@@ -73,63 +248,156 @@ def average_check(x_data, y_data, time_begin=None, time_end=None):
     Find average value in specified range
     """
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
     # Get the average value in the specified range
     data_slice = y_data[start_idx:end_idx]
-    avg_value = sum(data_slice) / len(data_slice)
+    if len(data_slice) == 0:
+        return None
+    avg_value = float(data_slice.mean())
     
     return avg_value
 
+def average_check_batch(x_data, y_data, windows):
+    """
+    Find average value for each (time_begin, time_end) window on the same
+    channel, None for empty windows. Every sample is summed once: a single
+    np.add.reduceat pass sums the segments between the sorted window bounds,
+    and each window adds up its segments through a running total.
+    """
+    ux = _uniform_params(x_data)
+    bounds = np.array([_range_indices(x_data, tb, te, ux) for tb, te in windows],
+                      dtype=np.intp).reshape(-1, 2)
+    starts, ends = bounds[:, 0], bounds[:, 1]
+    valid = ends > starts
+    results = [None] * len(windows)
+    if not valid.any():
+        return results
+    
+    hi = int(ends[valid].max())
+    edges = np.unique(bounds[valid])
+    edges = edges[edges < hi]
+    seg_sums = np.add.reduceat(y_data[:hi], edges, dtype=np.float64)
+    totals = np.concatenate(([0.0], np.cumsum(seg_sums)))
+    
+    sums = totals[np.searchsorted(edges, ends)] - totals[np.searchsorted(edges, starts)]
+    for k in np.flatnonzero(valid):
+        results[k] = float(sums[k] / (ends[k] - starts[k]))
+    return results
+
 def AverageLimit(x_data, y_data, time_begin=None, time_end=None, low_limit=None, high_limit=None):
     avg_value = average_check(x_data, y_data, time_begin, time_end)
     pass_fail, value = result_check(avg_value, low_limit, high_limit)
     return (pass_fail, value, None)  # Returns None for timestamp since average doesn't have one
 
-def threshold_cross(x_data, y_data, threshold, mode="rise", time_begin=None, time_end=None):
+def _first_cross_kernel(y_slice, threshold, rise):
+    """Index i of the first crossing between y_slice[i-1] and y_slice[i], -1 if none"""
+    for i in range(1, len(y_slice)):
+        if rise:
+            if y_slice[i-1] <= threshold and y_slice[i] > threshold:
+                return i
+        elif y_slice[i-1] >= threshold and y_slice[i] < threshold:
+            return i
+    return -1
+
+if njit is not None:
+    _first_cross_kernel = njit(cache=True, nogil=True)(_first_cross_kernel)
+
+def _first_cross(y_slice, threshold, mode):
     """
-    Find time when signal crosses threshold
+    Index i of the first crossing between y_slice[i-1] and y_slice[i], None
+    if there is none. Uses a compiled early-exit loop when numba is available,
+    otherwise vectorized scans a chunk at a time.
+    """
+    if njit is not None:
+        # Compare in the dtype NumPy would use so both paths agree on ties
+        i = _first_cross_kernel(y_slice, np.result_type(y_slice, threshold).type(threshold), mode == "rise")
+        return None if i < 0 else int(i)
+    
+    # Chunks overlap by one sample so a crossing on a chunk boundary isn't missed
+    for lo in range(0, len(y_slice) - 1, _CROSS_CHUNK):
+        y_chunk = y_slice[lo:lo + _CROSS_CHUNK + 1]
+        if mode == "rise":
+            hits = np.flatnonzero((y_chunk[:-1] <= threshold) & (y_chunk[1:] > threshold))
+        else:
+            hits = np.flatnonzero((y_chunk[:-1] >= threshold) & (y_chunk[1:] < threshold))
+        if hits.size:
+            return lo + int(hits[0]) + 1
+    return None
+
+def _threshold_cross(x_data, y_data, threshold, mode, start_idx, end_idx):
+    """
+    Find first threshold crossing between start_idx and end_idx.
+    Returns (t_cross, cross_idx) where cross_idx is the first sample at or
+    after t_cross, or (None, None) if there is no crossing.
     """
-    # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
-    
     # Get data slice
     x_slice = x_data[start_idx:end_idx]
     y_slice = y_data[start_idx:end_idx]
     
-    # Find crossing
-    for i in range(1, len(y_slice)):
-        if mode == "rise" and y_slice[i-1] <= threshold < y_slice[i]:
-            # Linear interpolation to get precise crossing time
-            t_cross = x_slice[i-1] + (threshold - y_slice[i-1]) * \
-                     (x_slice[i] - x_slice[i-1]) / (y_slice[i] - y_slice[i-1])
-            return t_cross
-            
-        elif mode == "fall" and y_slice[i-1] >= threshold > y_slice[i]:
-            # Linear interpolation to get precise crossing time
-            t_cross = x_slice[i-1] + (threshold - y_slice[i-1]) * \
-                     (x_slice[i] - x_slice[i-1]) / (y_slice[i] - y_slice[i-1])
-            return t_cross
-    # No crossing found
-    return None
+    if mode not in ("rise", "fall"):
+        return None, None
+    
+    i = _first_cross(y_slice, threshold, mode)
+    if i is None:
+        # No crossing found
+        return None, None
+    
+    # Linear interpolation to get precise crossing time
+    t_cross = x_slice[i-1] + (threshold - y_slice[i-1]) * \
+             (x_slice[i] - x_slice[i-1]) / (y_slice[i] - y_slice[i-1])
+    cross_idx = start_idx + (i - 1 if x_slice[i-1] >= t_cross else i)
+    return t_cross, cross_idx
+
+def threshold_cross(x_data, y_data, threshold, mode="rise", time_begin=None, time_end=None):
+    """
+    Find time when signal crosses threshold
+    """
+    # Find indices for the specified time range
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
+    
+    t_cross, _ = _threshold_cross(x_data, y_data, threshold, mode, start_idx, end_idx)
+    return t_cross
+
+def clear_cache():
+    """
+    Drop memoized threshold crossings, block tables, time axis layouts and
+    window statistics, call at the start of each test run
+    """
+    _cache.clear()
+
+def threshold_cross_cached(x_data, y_data, threshold, mode="rise", time_begin=None, time_end=None):
+    """
+    Memoized threshold_cross for composite measurements on the same waveform.
+    Returns (t_cross, cross_idx), see _threshold_cross.
+    """
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
+    return _cached("cross", (x_data, y_data), (float(threshold), mode, start_idx, end_idx),
+                   lambda: _threshold_cross(x_data, y_data, threshold, mode, start_idx, end_idx))
 
 def ThresholdCrossLimit(x_data, y_data, threshold, mode="rise", time_begin=None, time_end=None, low_limit=None, high_limit=None):
-    cross_time = threshold_cross(x_data, y_data, threshold, mode, time_begin, time_end)
+    cross_time, _ = threshold_cross_cached(x_data, y_data, threshold, mode, time_begin, time_end)
     pass_fail, value = result_check(cross_time, low_limit, high_limit)
     return (pass_fail, value, cross_time)  # Return crossing time as the timestamp
 
+def threshold_cross_multi(x_data, y_data, thresholds, mode="rise", time_begin=None, time_end=None):
+    """
+    Find crossing times of several thresholds on the same waveform.
+    Returns a list matching thresholds, None where a level isn't crossed.
+    A strictly monotonic window is answered with a single np.interp call.
+    """
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
+    x_slice = x_data[start_idx:end_idx]
+    y_slice = y_data[start_idx:end_idx]
+    
+    t_cross = None
+    if mode in ("rise", "fall"):
+        t_cross = _monotonic_crossings(x_slice, y_slice, thresholds, mode)
+    if t_cross is not None:
+        return list(t_cross)
+    return [_threshold_cross(x_data, y_data, threshold, mode, start_idx, end_idx)[0]
+            for threshold in thresholds]
+
 def edge_time_diff(x1_data, y1_data, x2_data, y2_data, threshold1, threshold2, 
                   mode1="rise", mode2="rise",
                   time_begin1=None, time_end1=None,
@@ -138,18 +406,18 @@ def edge_time_diff(x1_data, y1_data, x2_data, y2_data, threshold1, threshold2,
     Find time difference between two signal edge crossings
     """
     # Get first signal crossing time
-    t1 = threshold_cross(x1_data, y1_data,
-                        threshold=threshold1,
-                        mode=mode1,
-                        time_begin=time_begin1,
-                        time_end=time_end1)
+    t1, _ = threshold_cross_cached(x1_data, y1_data,
+                                   threshold=threshold1,
+                                   mode=mode1,
+                                   time_begin=time_begin1,
+                                   time_end=time_end1)
     
     # Get second signal crossing time
-    t2 = threshold_cross(x2_data, y2_data,
-                        threshold=threshold2,
-                        mode=mode2,
-                        time_begin=time_begin2,
-                        time_end=time_end2)
+    t2, _ = threshold_cross_cached(x2_data, y2_data,
+                                   threshold=threshold2,
+                                   mode=mode2,
+                                   time_begin=time_begin2,
+                                   time_end=time_end2)
     
     # If either crossing not found, return None
     if t1 is None or t2 is None:
@@ -170,96 +438,230 @@ def EdgeTimeDiffLimit(x1_data, y1_data, x2_data, y2_data, threshold1, threshold2
     pass_fail, value = result_check(time_diff, low_limit, high_limit)
     return (pass_fail, value, time_diff)  # Return time difference as timestamp
 
+def _edge_time_diff_job(job):
+    return edge_time_diff(**job)
+
+def edge_time_diff_batch(jobs):
+    """
+    Run several independent edge_time_diff measurements in parallel.
+    Each job is a dict of edge_time_diff keyword arguments; results are
+    returned in the same order as jobs.
+    """
+    return list(_pool.map(_edge_time_diff_job, jobs))
+
+def _scan_extremum(y_data, cross_idx, start_idx, end_idx, window, backwards, find_max):
+    """
+    Walk from cross_idx while the moving average keeps rising (find_max) or
+    falling, return the last index before it turns. Backwards scans average
+    the window ending at each index, forward scans the window starting there.
+    A rolling window sum keeps each step O(1). Between two full windows the
+    average changes by (added - removed) / window, so that sign is compared
+    directly and equal averages stay exactly equal.
+    """
+    n = len(y_data)
+    if backwards:
+        lo = max(0, cross_idx - window + 1)
+        hi = cross_idx + 1
+    else:
+        lo = cross_idx
+        hi = min(n, cross_idx + window)
+    total = 0.0
+    for k in range(lo, hi):
+        total += float(y_data[k])
+    prev_avg = total / (hi - lo)
+    
+    best_idx = cross_idx
+    i = cross_idx
+    while True:
+        if backwards:
+            i -= 1
+            if i <= start_idx:
+                break
+            hi -= 1
+            removed = float(y_data[hi])
+            if lo > 0:
+                lo -= 1
+                change = float(y_data[lo]) - removed
+                total += change
+            else:
+                total -= removed
+                change = total / (hi - lo) - prev_avg
+        else:
+            i += 1
+            if i >= end_idx:
+                break
+            removed = float(y_data[lo])
+            lo += 1
+            if hi < n:
+                change = float(y_data[hi]) - removed
+                total += change
+                hi += 1
+            else:
+                total -= removed
+                change = total / (hi - lo) - prev_avg
+        if find_max and change <= 0:  # Stop when signal stops increasing
+            break
+        if not find_max and change >= 0:  # Stop when signal stops decreasing
+            break
+        best_idx = i
+        prev_avg = total / (hi - lo)
+    return best_idx
+
+def _scan_extremum_prefix(y_data, cross_idx, start_idx, end_idx, window, backwards, find_max, block=4096):
+    """
+    Vectorized _scan_extremum for when numba is not available. Window
+    averages for a block of scan steps come from one prefix sum,
+    (cs[end] - cs[start]) / count, and the first step where the average
+    turns ends the scan.
+    """
+    n = len(y_data)
+    step = -1 if backwards else 1
+    steps = (cross_idx - start_idx - 1) if backwards else (end_idx - 1 - cross_idx)
+    if steps <= 0:
+        return cross_idx
+    
+    prev_avg = None
+    k0 = 0
+    while k0 <= steps:
+        k1 = min(steps, k0 + block - 1)
+        idx = cross_idx + step * np.arange(k0, k1 + 1)
+        if backwards:
+            w_start = np.maximum(idx - window + 1, 0)
+            w_end = idx + 1
+        else:
+            w_start = idx
+            w_end = np.minimum(idx + window, n)
+        base = w_start.min()
+        cs = np.concatenate(([0.0], np.cumsum(y_data[base:w_end.max()], dtype=np.float64)))
+        avgs = (cs[w_end - base] - cs[w_start - base]) / (w_end - w_start)
+        
+        # Change of each average from the one before it in scan order
+        if prev_avg is None:
+            idx, w_start, w_end = idx[1:], w_start[1:], w_end[1:]
+            change = avgs[1:] - avgs[:-1]
+        else:
+            change = avgs - np.concatenate(([prev_avg], avgs[:-1]))
+        # Full windows on both sides: the sign of (added - removed) is exact
+        if backwards:
+            full = idx - window + 1 > 0
+            added, removed = idx - window + 1, idx + 1
+        else:
+            full = idx + window <= n
+            added, removed = idx + window - 1, idx - 1
+        full_change = y_data[np.where(full, added, 0)] - y_data[np.where(full, removed, 0)]
+        change = np.where(full, full_change, change)
+        
+        turned = np.flatnonzero(change <= 0 if find_max else change >= 0)
+        if turned.size:
+            return int(idx[turned[0]] - step)
+        prev_avg = avgs[-1]
+        k0 = k1 + 1
+    return cross_idx + step * steps
+
+if njit is not None:
+    _scan_extremum = njit(cache=True, nogil=True)(_scan_extremum)
+else:
+    _scan_extremum = _scan_extremum_prefix
+
+def _monotonic_crossings(x_segment, y_segment, levels, mode):
+    """
+    Crossing times of all levels in one np.interp call when the segment is
+    strictly monotonic and every level is crossed, otherwise None
+    """
+    if len(y_segment) < 2:
+        return None
+    if mode == "rise":
+        if not np.all(np.diff(y_segment) > 0):
+            return None
+        y_sorted, x_sorted = y_segment, x_segment
+    else:
+        if not np.all(np.diff(y_segment) < 0):
+            return None
+        y_sorted, x_sorted = y_segment[::-1], x_segment[::-1]
+    # Same bounds threshold_cross accepts for a crossing
+    if mode == "rise" and not all(y_sorted[0] <= level < y_sorted[-1] for level in levels):
+        return None
+    if mode == "fall" and not all(y_sorted[0] < level <= y_sorted[-1] for level in levels):
+        return None
+    return np.interp(levels, y_sorted, x_sorted)
+
+def _two_crossings_kernel(x_segment, y_segment, level_a, level_b, rise):
+    """
+    First crossing times of two levels in a single pass, nan if not crossed.
+    Same crossing rule and interpolation as _threshold_cross.
+    """
+    t_a = np.nan
+    t_b = np.nan
+    for i in range(1, len(y_segment)):
+        y0 = y_segment[i-1]
+        y1 = y_segment[i]
+        dx = x_segment[i] - x_segment[i-1]
+        if np.isnan(t_a) and ((rise and y0 <= level_a < y1) or (not rise and y0 >= level_a > y1)):
+            t_a = x_segment[i-1] + (level_a - y0) * dx / (y1 - y0)
+        if np.isnan(t_b) and ((rise and y0 <= level_b < y1) or (not rise and y0 >= level_b > y1)):
+            t_b = x_segment[i-1] + (level_b - y0) * dx / (y1 - y0)
+        if not np.isnan(t_a) and not np.isnan(t_b):
+            break
+    return t_a, t_b
+
+if njit is not None:
+    _two_crossings_kernel = njit(cache=True, nogil=True)(_two_crossings_kernel)
+
+def _two_crossings(x_segment, y_segment, level_a, level_b, mode):
+    """
+    First crossing times of two levels, None where a level isn't crossed.
+    Uses one compiled pass when numba is available, otherwise two
+    vectorized threshold_cross scans.
+    """
+    if njit is None or mode not in ("rise", "fall"):
+        return (threshold_cross(x_segment, y_segment, level_a, mode),
+                threshold_cross(x_segment, y_segment, level_b, mode))
+    t_a, t_b = _two_crossings_kernel(x_segment, y_segment, float(level_a), float(level_b), mode == "rise")
+    return (None if np.isnan(t_a) else t_a), (None if np.isnan(t_b) else t_b)
+
+def warmup(dtype=np.float64):
+    """
+    Compile (or load from numba's cache) the kernels for signals of the given
+    dtype, so the first measurement doesn't pay for it. No-op without numba.
+    """
+    if njit is None:
+        return
+    x = np.linspace(0.0, 1.0, 32)
+    y = np.abs(np.linspace(-1.0, 1.0, 32)).astype(dtype)
+    _minmax_kernel(y)
+    _first_cross_kernel(y, y.dtype.type(0.5), True)
+    _scan_extremum(y, 16, 0, len(y), 4, True, False)
+    _two_crossings_kernel(x, y, 0.25, 0.75, False)
+
 def transition_duration(x_data, y_data, min_level, mode="rise", lower_threshold=0.1, upper_threshold=0.9, time_begin=None, time_end=None):
     """Calculate rise/fall time between specified thresholds"""    
-    # Find the time when signal crosses min_level
-    t_cross = threshold_cross(x_data, y_data, min_level, mode, time_begin, time_end)
+    # Find the time when signal crosses min_level and the index closest to it
+    t_cross, cross_idx = threshold_cross_cached(x_data, y_data, min_level, mode, time_begin, time_end)
     if t_cross is None:
-        print(f"Could not find crossing at min_level={min_level} between t={time_begin} and t={time_end}")
+        logger.debug("Could not find crossing at min_level=%s between t=%s and t=%s", min_level, time_begin, time_end)
         return None
     
-    #print(f"Found min_level crossing at t = {t_cross:.6f}")
+    logger.debug("Found min_level crossing at t = %.6f", t_cross)
     
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
     # Verify we have enough data points in range
     if end_idx - start_idx < 2:
-        print(f"Not enough data points between t={time_begin} and t={time_end}")
+        logger.debug("Not enough data points between t=%s and t=%s", time_begin, time_end)
         return None
-        
-    # Find the index closest to crossing time
-    try:
-        cross_idx = next(i for i, x in enumerate(x_data[start_idx:end_idx]) if x >= t_cross) + start_idx
-        #print(f"Cross index found at t = {x_data[cross_idx]:.6f}")
-    except StopIteration:
-        print(f"Could not find index for crossing time t={t_cross}")
-        return None
-    
-    # Function to calculate moving average
-    def moving_average(data, idx, window=10, backwards=False):
-        if backwards:
-            start = max(0, idx - window + 1)
-            points = [float(data[i]) for i in range(start, idx + 1)]
-        else:
-            end = min(len(data), idx + window)
-            points = [float(data[i]) for i in range(idx, end)]
-        return sum(points) / len(points)
     
+    # Walk outwards from the crossing until the moving average turns
     if mode == "rise":
-        # Look backwards for minimum
-        min_idx = cross_idx
-        prev_avg = moving_average(y_data, min_idx, backwards=True)
-        
-        for i in range(cross_idx - 1, start_idx, -1):
-            curr_avg = moving_average(y_data, i, backwards=True)
-            if curr_avg >= prev_avg:  # Stop when signal stops decreasing
-                break
-            min_idx = i
-            prev_avg = curr_avg
-                
-        # Look forwards for maximum
-        max_idx = cross_idx
-        prev_avg = moving_average(y_data, max_idx)
-        
-        for i in range(cross_idx + 1, end_idx):
-            curr_avg = moving_average(y_data, i)
-            if curr_avg <= prev_avg:  # Stop when signal stops increasing
-                break
-            max_idx = i
-            prev_avg = curr_avg
-            
+        min_idx = _scan_extremum(y_data, cross_idx, start_idx, end_idx, 10, True, False)
+        max_idx = _scan_extremum(y_data, cross_idx, start_idx, end_idx, 10, False, True)
     else:  # mode == "fall"
-        # Look backwards for maximum
-        max_idx = cross_idx
-        prev_avg = moving_average(y_data, max_idx, backwards=True)
-        
-        for i in range(cross_idx - 1, start_idx, -1):
-            curr_avg = moving_average(y_data, i, backwards=True)
-            if curr_avg <= prev_avg:  # Stop when signal stops increasing
-                break
-            max_idx = i
-            prev_avg = curr_avg
-                
-        # Look forwards for minimum
-        min_idx = cross_idx
-        prev_avg = moving_average(y_data, min_idx)
-        
-        for i in range(cross_idx + 1, end_idx):
-            curr_avg = moving_average(y_data, i)
-            if curr_avg >= prev_avg:  # Stop when signal stops decreasing
-                break
-            min_idx = i
-            prev_avg = curr_avg
+        max_idx = _scan_extremum(y_data, cross_idx, start_idx, end_idx, 10, True, True)
+        min_idx = _scan_extremum(y_data, cross_idx, start_idx, end_idx, 10, False, False)
     
-    #print(f"Found min at t = {x_data[min_idx]:.6f}, y = {float(y_data[min_idx]):.6f}")
-    #print(f"Found max at t = {x_data[max_idx]:.6f}, y = {float(y_data[max_idx]):.6f}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Found min at t = %.6f, y = %.6f", x_data[min_idx], y_data[min_idx])
+        logger.debug("Found max at t = %.6f, y = %.6f", x_data[max_idx], y_data[max_idx])
     
     # Calculate reference levels
     y_min = float(y_data[min_idx])
@@ -269,7 +671,7 @@ def transition_duration(x_data, y_data, min_level, mode="rise", lower_threshold=
     # Calculate threshold levels
     y_lower = y_min + lower_threshold * y_range
     y_upper = y_min + upper_threshold * y_range
-    #print(f"Calculated threshold levels: lower = {y_lower:.3f}, upper = {y_upper:.3f}")
+    logger.debug("Calculated threshold levels: lower = %.3f, upper = %.3f", y_lower, y_upper)
     
     # Handle case where transition happens between adjacent points
     if abs(max_idx - min_idx) <= 1:
@@ -285,25 +687,27 @@ def transition_duration(x_data, y_data, min_level, mode="rise", lower_threshold=
             t_upper = x0 + (y_lower - y0) * (x1 - x0)/(y1 - y0)
             
         trans_time = abs(t_upper - t_lower)
-        #print(f"Interpolated transition time = {trans_time:.6f}")
+        logger.debug("Interpolated transition time = %.6f", trans_time)
         return trans_time
     
     # Find times at threshold levels using interpolation within min_idx to max_idx range
     x_segment = x_data[min_idx:max_idx+1]
     y_segment = y_data[min_idx:max_idx+1]
     
-    t_lower = threshold_cross(x_segment, y_segment, y_lower, mode)
-    t_upper = threshold_cross(x_segment, y_segment, y_upper, mode)
+    crossings = _monotonic_crossings(x_segment, y_segment, (y_lower, y_upper), mode)
+    if crossings is None:
+        crossings = _two_crossings(x_segment, y_segment, y_lower, y_upper, mode)
+    t_lower, t_upper = crossings
     
     if t_lower is None or t_upper is None:
-        print("Could not find threshold crossings within min-max range")
+        logger.debug("Could not find threshold crossings within min-max range")
         return None
         
-    #print(f"Found threshold crossings at t_lower = {t_lower:.6f}, t_upper = {t_upper:.6f}")
+    logger.debug("Found threshold crossings at t_lower = %.6f, t_upper = %.6f", t_lower, t_upper)
     
     # Calculate transition time
     trans_time = abs(t_upper - t_lower)
-    #print(f"Calculated transition time = {trans_time:.6f}")
+    logger.debug("Calculated transition time = %.6f", trans_time)
     
     return trans_time
 
@@ -321,19 +725,19 @@ def pulse_width(x_data, y_data, threshold, mode="rise", time_begin=None, time_en
     at specified threshold level.
     """
     # Find first edge
-    t1 = threshold_cross(x_data, y_data, threshold, mode, time_begin, time_end)
+    t1, _ = threshold_cross_cached(x_data, y_data, threshold, mode, time_begin, time_end)
     if t1 is None:
-        print(f"First edge not found at threshold={threshold}")
+        logger.debug("First edge not found at threshold=%s", threshold)
         return None
     
     # Find second edge with opposite mode, starting from t1
     opposite_mode = "fall" if mode == "rise" else "rise"
     t2 = threshold_cross(x_data, y_data, threshold, opposite_mode, time_begin=t1, time_end=time_end)
     if t2 is None:
-        print(f"Second edge not found at threshold={threshold}")
+        logger.debug("Second edge not found at threshold=%s", threshold)
         return None
     
-    #print(f"First edge at t1={t1:.6f}s, Second edge at t2={t2:.6f}s")
+    logger.debug("First edge at t1=%.6fs, Second edge at t2=%.6fs", t1, t2)
     return t2 - t1
 
 def PulseWidthLimit(x_data, y_data, threshold, mode="rise", time_begin=None, time_end=None, low_limit=None, high_limit=None):
@@ -341,18 +745,56 @@ def PulseWidthLimit(x_data, y_data, threshold, mode="rise", time_begin=None, tim
     pass_fail, value = result_check(width, low_limit, high_limit)
     return (pass_fail, value, width)  # Return pulse width as timestamp
 
-def freq(x_data, y_data, time_begin=None, time_end=None):
+def freq_fast(x_data, y_data, time_begin=None, time_end=None):
     """
-    Calculate the dominant frequency of the signal using Welch's method
+    Calculate the dominant frequency of a clean periodic signal from the
+    spacing of its rising crossings through the mid level
     """
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+    # Get data slice
+    x_slice = x_data[start_idx:end_idx]
+    y_slice = y_data[start_idx:end_idx]
+    if len(y_slice) < 2:
+        return None
+    
+    # Signal levels from the 5th/95th percentiles, so a spike or glitch in the
+    # window can't drag the mid level off the waveform. Clean pulse trains
+    # under 5% duty cycle have no spread there and use the full range instead.
+    y_min, y_max = np.percentile(y_slice, [5, 95])
+    if y_max <= y_min:
+        y_min, y_max = _cached("minmax", (y_data,), (start_idx, end_idx), lambda: _minmax(y_slice))
+    
+    # Rising crossings through the mid level, one per period. Samples between
+    # the 25% and 75% levels are ignored so noise can't add crossings.
+    mid = (y_min + y_max) / 2
+    band = 0.25 * (y_max - y_min)
+    settled = np.flatnonzero((y_slice > mid + band) | (y_slice < mid - band))
+    high = y_slice[settled] > mid
+    crossings = settled[1:][high[1:] & ~high[:-1]]
+    if len(crossings) < 2:
+        return None
+    
+    span = x_slice[crossings[-1]] - x_slice[crossings[0]]
+    return (len(crossings) - 1) / span
+
+def freq(x_data, y_data, time_begin=None, time_end=None, method="fft"):
+    """
+    Calculate the dominant frequency of the signal.
+    method="fft" picks the peak of a single windowed rfft,
+    method="crossing" counts mid-level crossings (see freq_fast),
+    method="autocorr" takes the period from the autocorrelation peak,
+    method="welch" picks the peak of Welch's power spectral density.
+    Any other method raises ValueError.
+    """
+    if method not in ("fft", "crossing", "autocorr", "welch"):
+        raise ValueError(f"Unknown freq method: {method}")
+    if method == "crossing":
+        return freq_fast(x_data, y_data, time_begin, time_end)
+    
+    # Find indices for the specified time range
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
     # Get data slice
     y_slice = y_data[start_idx:end_idx]
@@ -361,17 +803,67 @@ def freq(x_data, y_data, time_begin=None, time_end=None):
     dt = x_data[1] - x_data[0]  # Assuming uniform sampling
     fs = 1/dt
     
-    # Calculate power spectral density using Welch's method
+    if method == "fft":
+        if len(y_slice) < 3:
+            return None
+        # One Hann-windowed transform of the detrended slice
+        y = y_slice - y_slice.mean()
+        spectrum = np.fft.rfft(y * np.hanning(len(y)))
+        psd = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
+        k = int(psd.argmax())
+        # Parabolic interpolation of the log power around the peak bin
+        offset = 0.0
+        if 0 < k < len(psd) - 1 and psd[k-1] > 0 and psd[k+1] > 0:
+            a, b, c = np.log(psd[k-1:k+2])
+            denom = a - 2*b + c
+            if denom != 0:
+                offset = 0.5 * (a - c) / denom
+        dominant_freq = (k + offset) * fs / len(y)
+        logger.debug("Dominant frequency: %.2f Hz", dominant_freq)
+        return dominant_freq
+    
+    if method == "autocorr":
+        n = len(y_slice)
+        if n < 4:
+            return None
+        # Wiener-Khinchin: autocorrelation is the inverse transform of the
+        # power spectrum, zero-padded to a power of two >= 2n-1 so the
+        # circular correlation doesn't wrap
+        y = y_slice - y_slice.mean()
+        nfft = 1 << (2*n - 1).bit_length()
+        spectrum = np.fft.rfft(y, n=nfft)
+        acorr = np.fft.irfft(spectrum.real * spectrum.real + spectrum.imag * spectrum.imag, n=nfft)[:n]
+        # The period is the highest peak after the first zero crossing
+        below = np.flatnonzero(acorr <= 0)
+        if below.size == 0:
+            return None
+        lag = int(below[0]) + int(acorr[below[0]:].argmax())
+        if acorr[lag] <= 0:
+            return None
+        # Parabolic interpolation around the peak lag
+        offset = 0.0
+        if lag < n - 1:
+            a, b, c = acorr[lag-1:lag+2]
+            denom = a - 2*b + c
+            if denom != 0:
+                offset = 0.5 * (a - c) / denom
+        dominant_freq = fs / (lag + offset)
+        logger.debug("Dominant frequency: %.2f Hz", dominant_freq)
+        return dominant_freq
+    
+    # Calculate power spectral density using Welch's method. scipy.signal is
+    # only imported here since the default method doesn't need it.
+    from scipy import signal
     frequencies, psd = signal.welch(y_slice, fs=fs, nperseg=min(len(y_slice), 1024))
     
     # Find frequency with maximum power
     dominant_freq = frequencies[psd.argmax()]
     
-    #print(f"Dominant frequency: {dominant_freq:.2f} Hz")
+    logger.debug("Dominant frequency: %.2f Hz", dominant_freq)
     return dominant_freq
 
-def FreqLimit(x_data, y_data, time_begin=None, time_end=None, low_limit=None, high_limit=None):
-    frequency = freq(x_data, y_data, time_begin, time_end)
+def FreqLimit(x_data, y_data, time_begin=None, time_end=None, low_limit=None, high_limit=None, method="fft"):
+    frequency = freq(x_data, y_data, time_begin, time_end, method)
     pass_fail, value = result_check(frequency, low_limit, high_limit)
     return (pass_fail, value, None)  # Return None for timestamp since frequency is a rate
 
@@ -380,23 +872,16 @@ def DutyCycle(x_data, y_data, time_begin=None, time_end=None):
     Calculate duty cycle of a digital signal
     """
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     # Get data slice
     y_slice = y_data[start_idx:end_idx]
-    # Calculate mean of signal
-    y_min = np.min(y_slice)
-    y_max = np.max(y_slice)
-    # Normalize signal between 0 and 1
+    # Signal range in a single pass, memoized per window
+    y_min, y_max = _cached("minmax", (y_data,), (start_idx, end_idx), lambda: _minmax(y_slice))
     if y_max == y_min:
         return None  
-    y_normalized = (y_slice - y_min) / (y_max - y_min)
-    # Calculate duty cycle (mean of normalized signal)
-    duty_cycle = np.mean(y_normalized)
+    # Duty cycle is the mean of the signal normalized between 0 and 1,
+    # taken from the mean directly instead of a normalized copy
+    duty_cycle = (np.mean(y_slice) - y_min) / (y_max - y_min)
     return duty_cycle
 
 def DutyCycleLimit(x_data, y_data, time_begin=None, time_end=None, low_limit=None, high_limit=None):
@@ -409,25 +894,15 @@ def PulseCount(x_data, y_data, threshold, time_begin=None, time_end=None):
     Count number of pulses by detecting rising edges crossing the threshold
     """
     # Find indices for the specified time range
-    start_idx = 0
-    end_idx = len(x_data)
-    
-    if time_begin is not None:
-        start_idx = next((i for i, x in enumerate(x_data) if x >= time_begin), 0)
-    if time_end is not None:
-        end_idx = next((i for i, x in enumerate(x_data) if x > time_end), len(x_data))
-    
-    # Get data slice
-    y_slice = y_data[start_idx:end_idx]
-    
-    # Convert signal to binary (above/below threshold)
-    binary_signal = (y_slice > threshold).astype(int)
+    start_idx, end_idx = _range_indices(x_data, time_begin, time_end)
     
-    # Detect edges using diff
-    edges = np.diff(binary_signal)
+    def count_edges():
+        # Convert signal to binary (above/below threshold)
+        above = y_data[start_idx:end_idx] > threshold
+        # Count rising edges (below followed by above), staying in bool arrays
+        return np.count_nonzero(above[1:] & ~above[:-1])
     
-    # Count rising edges (transitions from 0 to 1)
-    pulse_count = np.sum(edges == 1)
+    pulse_count = _cached("pulses", (y_data,), (float(threshold), start_idx, end_idx), count_edges)
     
     return pulse_count
 
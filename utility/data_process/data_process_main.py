@@ -1,158 +1,147 @@
 from nptdms import TdmsFile
 import data_process_func as dpf
 import json
-from multiprocessing import Pool, cpu_count
+import sys
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Open TDMS file
 tdms_file_path = "C:/Users/yusha/Desktop/test sequencer/utility/data_process/dummy_data.tdms"
 measurement_config_path = "measurement1.json"  # Add config file path
 
+def load_config(config_path):
+    """
+    Load a measurement config, parsed with orjson when it is installed.
+    Configs orjson rejects (NaN/Infinity literals, a UTF-8 BOM) go to json.
+    """
+    with open(config_path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
 # Load measurement config
-with open(measurement_config_path) as f:
-    config = json.load(f)
+config = load_config(measurement_config_path)
 
-tdms_file = TdmsFile(tdms_file_path)
+# Open TdmsFile to stream from, set by the caller for the duration of a run:
+# only the channels the requirements use are read, see read_channel/load_channels
+tdms_file = None
 
-def print_result(req_id, func_name, result_data):
-    """Print test results based on function type"""
-    passed = result_data[0]
-    status = 'PASS' if passed else 'FAIL'
-    
-    if func_name == "max":
-        print(f"REQ {req_id}: {status} (Max: {result_data[1]:.3f}, Time: {result_data[2]:.3f}s)")
-    elif func_name == "min":
-        print(f"REQ {req_id}: {status} (Min: {result_data[1]:.3f}, Time: {result_data[2]:.3f}s)")
-    elif func_name == "average":
-        print(f"REQ {req_id}: {status} (Average: {result_data[1]:.3f})")
-    elif func_name == "rise":
-        print(f"REQ {req_id}: {status} (Rise Time: {result_data[1]:.3f}s)")
-    elif func_name == "threshold_cross":
-        time_str = f"Time: {result_data[1]:.3f}s" if result_data[1] is not None else "No crossing found"
-        print(f"REQ {req_id}: {status} ({time_str})")
-    elif func_name == "edge_time_diff":
-        time_str = f"Time Diff: {result_data[1]:.3f}s" if result_data[1] is not None else "No crossing found"
-        print(f"REQ {req_id}: {status} ({time_str})")
-    elif func_name == "transition_time":
-        time_str = f"Transition Time: {result_data[1]:.6f}s" if result_data[1] is not None else "No valid transition found"
-        print(f"REQ {req_id}: {status} ({time_str})")
-    elif func_name == "pulse_width":
-        width_str = f"Pulse Width: {result_data[1]:.6f}s" if result_data[1] is not None else "No valid pulse found"
-        print(f"REQ {req_id}: {status} ({width_str})")
-    elif func_name == "frequency":
-        freq_str = f"Frequency: {result_data[1]:.2f} Hz" if result_data[1] is not None else "No frequency detected"
-        print(f"REQ {req_id}: {status} ({freq_str})")
-    elif func_name == "duty_cycle":
-        duty_str = f"Duty Cycle: {result_data[1]:.1f}" if result_data[1] is not None else "No duty cycle detected"
-        print(f"REQ {req_id}: {status} ({duty_str})")
-    elif func_name == "pulse_count":
-        count_str = f"Pulse Count: {result_data[1]}" if result_data[1] is not None else "No pulses detected"
-        print(f"REQ {req_id}: {status} ({count_str})")
-    else:
-        print(f"REQ {req_id}: {status}")
+# Channel data already read from tdms_file, keyed by (group, channel name)
+channel_cache = {}
+
+# Signal channels are stored as float32: scope/DAQ data carries far less
+# than 24 bits of resolution and halving the bytes speeds up every reduction.
+# Time channels stay float64 so timestamps keep full precision.
+SIGNAL_DTYPE = np.float32
+
+def read_channel(group_name, channel_name, dtype=None):
+    """Read channel data once and reuse it for later requirements"""
+    key = (group_name, channel_name)
+    data = channel_cache.get(key)
+    if data is None:
+        # Contiguous so reductions stream and the numba kernels see one layout
+        data = np.ascontiguousarray(tdms_file[group_name][channel_name][:], dtype=dtype)
+        channel_cache[key] = data
+    return data
+
+def _or_none(fmt, missing):
+    """Formatter for the result value, or the missing text when it is None"""
+    return lambda r: fmt.format(r[1]) if r[1] is not None else missing
+
+# Result details for each func_name, shown in parentheses after the status
+FORMATTERS = {
+    "max": lambda r: f"Max: {r[1]:.3f}, Time: {r[2]:.3f}s",
+    "min": lambda r: f"Min: {r[1]:.3f}, Time: {r[2]:.3f}s",
+    "average": lambda r: f"Average: {r[1]:.3f}",
+    "rise": lambda r: f"Rise Time: {r[1]:.3f}s",
+    "threshold_cross": _or_none("Time: {:.3f}s", "No crossing found"),
+    "edge_time_diff": _or_none("Time Diff: {:.3f}s", "No crossing found"),
+    "transition_time": _or_none("Transition Time: {:.6f}s", "No valid transition found"),
+    "pulse_width": _or_none("Pulse Width: {:.6f}s", "No valid pulse found"),
+    "frequency": _or_none("Frequency: {:.2f} Hz", "No frequency detected"),
+    "duty_cycle": _or_none("Duty Cycle: {:.1f}", "No duty cycle detected"),
+    "pulse_count": _or_none("Pulse Count: {}", "No pulses detected"),
+}
+
+def format_result(req_id, func_name, result_data):
+    """Format test results based on function type"""
+    status = 'PASS' if result_data[0] else 'FAIL'
+    formatter = FORMATTERS.get(func_name)
+    if formatter is None:
+        return f"REQ {req_id}: {status}"
+    return f"REQ {req_id}: {status} ({formatter(result_data)})"
+
+def _config_args(*names, **renamed):
+    """Map function keyword arguments to config keys, same name unless renamed"""
+    args = {name: name for name in names}
+    args.update(renamed)
+    return args
+
+LIMIT_ARGS = ("time_begin", "time_end", "low_limit", "high_limit")
+
+# Limit function and its config arguments for each func_name
+DISPATCH = {
+    "max": (dpf.MaxLimit, _config_args(*LIMIT_ARGS)),
+    "min": (dpf.MinLimit, _config_args(*LIMIT_ARGS)),
+    "average": (dpf.AverageLimit, _config_args(*LIMIT_ARGS)),
+    "threshold_cross": (dpf.ThresholdCrossLimit, _config_args("threshold", "mode", *LIMIT_ARGS)),
+    "edge_time_diff": (dpf.EdgeTimeDiffLimit, _config_args("threshold2", "mode2", "time_begin2", "time_end2",
+                                                           "low_limit", "high_limit",
+                                                           threshold1="threshold", mode1="mode",
+                                                           time_begin1="time_begin", time_end1="time_end")),
+    "transition_time": (dpf.TransitionDurationLimit, _config_args("mode", "lower_threshold", "upper_threshold",
+                                                                  "min_level", *LIMIT_ARGS)),
+    "pulse_width": (dpf.PulseWidthLimit, _config_args("threshold", "mode", *LIMIT_ARGS)),
+    "frequency": (dpf.FreqLimit, _config_args(*LIMIT_ARGS)),
+    "duty_cycle": (dpf.DutyCycleLimit, _config_args(*LIMIT_ARGS)),
+    "pulse_count": (dpf.PulseCountLimit, _config_args("threshold", *LIMIT_ARGS)),
+}
+
+# Config arguments passed only when the requirement sets them
+OPTIONAL_ARGS = {
+    "frequency": _config_args("method"),
+}
 
 def process_requirement(req):
     """Process a single test requirement"""
     try:
+        handler = DISPATCH.get(req["func_name"])
+        if handler is None:
+            return req['req_id'], None, f"Unknown function: {req['func_name']}"
+        
         # Get channel names
         y_channel_name = req["channel_name"]
         x_channel_name = f"{y_channel_name}_Time"
         
         # Read channel data from specified group
-        group = tdms_file[req["Group"]]
-        x_channel = group[x_channel_name]
-        y_channel = group[y_channel_name]
-
-        # Convert channel data to lists
-        x_data = x_channel[:]
-        y_data = y_channel[:]
+        x_data = read_channel(req["Group"], x_channel_name)
+        y_data = read_channel(req["Group"], y_channel_name, SIGNAL_DTYPE)
 
         # Call the specified function with parameters from config
-        result = None
-        if req["func_name"] == "max":
-            result = dpf.MaxLimit(x_data, y_data,
-                                time_begin=req["time_begin"],
-                                time_end=req["time_end"],
-                                low_limit=req["low_limit"],
-                                high_limit=req["high_limit"])
-            
-        elif req["func_name"] == "min":
-            result = dpf.MinLimit(x_data, y_data,
-                                time_begin=req["time_begin"],
-                                time_end=req["time_end"],
-                                low_limit=req["low_limit"],
-                                high_limit=req["high_limit"])
-            
-        elif req["func_name"] == "average":
-            result = dpf.AverageLimit(x_data, y_data,
-                                    time_begin=req["time_begin"],
-                                    time_end=req["time_end"],
-                                    low_limit=req["low_limit"],
-                                    high_limit=req["high_limit"])
-        elif req["func_name"] == "threshold_cross":
-            result = dpf.ThresholdCrossLimit(x_data, y_data,
-                                           threshold=req["threshold"],
-                                           mode=req["mode"],
-                                           time_begin=req["time_begin"],
-                                           time_end=req["time_end"],
-                                           low_limit=req["low_limit"],
-                                           high_limit=req["high_limit"])
-        elif req["func_name"] == "edge_time_diff":
+        func, arg_map = handler
+        kwargs = {arg: req[key] for arg, key in arg_map.items()}
+        kwargs.update({arg: req[key] for arg, key in OPTIONAL_ARGS.get(req["func_name"], {}).items()
+                       if key in req})
+        
+        if req["func_name"] == "edge_time_diff":
             # Get second channel data
             x2_channel_name = f"{req['channel_name2']}_Time"
-            x2_channel = group[x2_channel_name]
-            y2_channel = group[req['channel_name2']]
-            x2_data = x2_channel[:]
-            y2_data = y2_channel[:]
-            
-            result = dpf.EdgeTimeDiffLimit(x_data, y_data, x2_data, y2_data,
-                                         threshold1=req["threshold"],
-                                         threshold2=req["threshold2"],
-                                         mode1=req["mode"],
-                                         mode2=req["mode2"],
-                                         time_begin1=req["time_begin"],
-                                         time_end1=req["time_end"],
-                                         time_begin2=req["time_begin2"],
-                                         time_end2=req["time_end2"],
-                                         low_limit=req["low_limit"],
-                                         high_limit=req["high_limit"])
-        elif req["func_name"] == "transition_time":
-            result = dpf.TransitionDurationLimit(x_data, y_data,
-                                               mode=req["mode"],
-                                               lower_threshold=req["lower_threshold"],
-                                               upper_threshold=req["upper_threshold"],
-                                               time_begin=req["time_begin"],
-                                               time_end=req["time_end"],
-                                               min_level=req["min_level"],
-                                               low_limit=req["low_limit"],
-                                               high_limit=req["high_limit"])
-        elif req["func_name"] == "pulse_width":
-            result = dpf.PulseWidthLimit(x_data, y_data,
-                                       threshold=req["threshold"],
-                                       mode=req["mode"],
-                                       time_begin=req["time_begin"],
-                                       time_end=req["time_end"],
-                                       low_limit=req["low_limit"],
-                                       high_limit=req["high_limit"])
-        elif req["func_name"] == "frequency":
-            result = dpf.FreqLimit(x_data, y_data,
-                                 time_begin=req["time_begin"],
-                                 time_end=req["time_end"],
-                                 low_limit=req["low_limit"],
-                                 high_limit=req["high_limit"])
-        elif req["func_name"] == "duty_cycle":
-            result = dpf.DutyCycleLimit(x_data, y_data,
-                                      time_begin=req["time_begin"],
-                                      time_end=req["time_end"],
-                                      low_limit=req["low_limit"],
-                                      high_limit=req["high_limit"])
-                                    
-        elif req["func_name"] == "pulse_count":
-            result = dpf.PulseCountLimit(x_data, y_data,
-                                       threshold=req["threshold"],
-                                       time_begin=req["time_begin"],
-                                       time_end=req["time_end"],
-                                       low_limit=req["low_limit"],
-                                       high_limit=req["high_limit"])
+            x2_data = read_channel(req["Group"], x2_channel_name)
+            y2_data = read_channel(req["Group"], req['channel_name2'], SIGNAL_DTYPE)
+            result = func(x_data, y_data, x2_data, y2_data, **kwargs)
+        else:
+            result = func(x_data, y_data, **kwargs)
         
         # Return results instead of printing
         return req['req_id'], req['func_name'], result
@@ -160,14 +149,142 @@ def process_requirement(req):
     except Exception as e:
         return req['req_id'], None, f"Error: {str(e)}"
 
+def required_channels(requirements):
+    """
+    (group, channel name) of every channel the requirements read, with its dtype.
+    Requirements missing a channel key are skipped, process_requirement reports them.
+    """
+    channels = {}
+    for req in requirements:
+        try:
+            names = [req["channel_name"]]
+            if req.get("func_name") == "edge_time_diff":
+                names.append(req["channel_name2"])
+            group_name = req["Group"]
+        except KeyError:
+            continue
+        for name in names:
+            channels[(group_name, name)] = SIGNAL_DTYPE
+            channels[(group_name, f"{name}_Time")] = None
+    return channels
+
+def load_channels(requirements):
+    """Read every required channel up front so worker threads only hit the cache"""
+    for key, dtype in required_channels(requirements).items():
+        try:
+            read_channel(*key, dtype)
+        except Exception:
+            continue  # Missing channel, reported by the requirement that uses it
+
+def channel_order(requirements):
+    """
+    Indices of requirements grouped by channel, config order kept within a channel.
+    Requirements missing Group or channel_name still run, process_requirement reports them.
+    """
+    buckets = defaultdict(list)
+    for idx, req in enumerate(requirements):
+        buckets[(req.get("Group"), req.get("channel_name"))].append(idx)
+    return [idx for idxs in buckets.values() for idx in idxs]
+
+def process_averages(requirements):
+    """
+    Results of the "average" requirements keyed by config index. Windows on
+    the same channel are answered together by one dpf.average_check_batch call.
+    """
+    buckets = defaultdict(list)
+    for idx, req in enumerate(requirements):
+        if req.get("func_name") != "average":
+            continue
+        try:
+            key = (req["Group"], req["channel_name"])
+        except KeyError:
+            continue  # Left to process_requirement, which reports the error
+        buckets[key].append(idx)
+    
+    results = {}
+    for (group_name, channel_name), idxs in buckets.items():
+        try:
+            x_data = read_channel(group_name, f"{channel_name}_Time")
+            y_data = read_channel(group_name, channel_name, SIGNAL_DTYPE)
+            windows = [(requirements[idx]["time_begin"], requirements[idx]["time_end"]) for idx in idxs]
+            averages = dpf.average_check_batch(x_data, y_data, windows)
+            checks = dpf.result_check_batch(averages,
+                                            [requirements[idx]["low_limit"] for idx in idxs],
+                                            [requirements[idx]["high_limit"] for idx in idxs])
+        except Exception:
+            continue  # Left to process_requirement, which reports the error
+        for idx, (pass_fail, value) in zip(idxs, checks):
+            req = requirements[idx]
+            results[idx] = (req['req_id'], req['func_name'], (pass_fail, value, None))
+    return results
+
+def process_threshold_crosses(requirements):
+    """
+    Results of the "threshold_cross" requirements keyed by config index.
+    Thresholds sharing a channel, window and mode are answered together by
+    one dpf.threshold_cross_multi call; single ones stay on the cached path.
+    """
+    buckets = defaultdict(list)
+    for idx, req in enumerate(requirements):
+        if req.get("func_name") != "threshold_cross":
+            continue
+        try:
+            key = (req["Group"], req["channel_name"], req["time_begin"], req["time_end"], req["mode"])
+        except KeyError:
+            continue  # Left to process_requirement, which reports the error
+        buckets[key].append(idx)
+    
+    results = {}
+    for (group_name, channel_name, time_begin, time_end, mode), idxs in buckets.items():
+        if len(idxs) < 2:
+            continue
+        try:
+            x_data = read_channel(group_name, f"{channel_name}_Time")
+            y_data = read_channel(group_name, channel_name, SIGNAL_DTYPE)
+            thresholds = [requirements[idx]["threshold"] for idx in idxs]
+            cross_times = dpf.threshold_cross_multi(x_data, y_data, thresholds, mode, time_begin, time_end)
+            checks = [dpf.result_check(cross_time, requirements[idx]["low_limit"], requirements[idx]["high_limit"])
+                      for idx, cross_time in zip(idxs, cross_times)]
+        except Exception:
+            continue  # Left to process_requirement, which reports the error
+        for idx, (pass_fail, value), cross_time in zip(idxs, checks, cross_times):
+            req = requirements[idx]
+            results[idx] = (req['req_id'], req['func_name'], (pass_fail, value, cross_time))
+    return results
+
+def process_requirements(requirements):
+    """
+    Process requirements in parallel, channel by channel, and return results
+    in config order. NumPy reductions release the GIL, so worker threads
+    share the loaded channels and dpf caches without copying or pickling.
+    """
+    dpf.clear_cache()
+    dpf.warmup(SIGNAL_DTYPE)
+    load_channels(requirements)
+    batched = process_averages(requirements)
+    batched.update(process_threshold_crosses(requirements))
+    order = [idx for idx in channel_order(requirements) if idx not in batched]
+    with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
+        grouped_results = list(executor.map(process_requirement,
+                                            [requirements[idx] for idx in order]))
+    
+    results = [None] * len(requirements)
+    for idx, result in batched.items():
+        results[idx] = result
+    for idx, result in zip(order, grouped_results):
+        results[idx] = result
+    return results
+
 if __name__ == '__main__':
-    # Process requirements in parallel
-    with Pool(processes=cpu_count()) as pool:
-        results = pool.map(process_requirement, config["test_requirements"])
+    # Process requirements in parallel, streaming channels from the open file
+    with TdmsFile.open(tdms_file_path) as tdms_file:
+        results = process_requirements(config["test_requirements"])
         
-    # Print results in order
+    # Print results in order, written out in one go
+    lines = []
     for req_id, func_name, result in results:
         if func_name:
-            print_result(req_id, func_name, result)
+            lines.append(format_result(req_id, func_name, result))
         else:
-            print(f"Error processing {req_id}: {result}")
\ No newline at end of file
+            lines.append(f"Error processing {req_id}: {result}")
+    sys.stdout.write("\n".join(lines) + "\n")
@@ -3,10 +3,19 @@ from nptdms import TdmsWriter, RootObject, GroupObject, ChannelObject
 
 # Set the total number of points and time range
 n_points = 100000
-time = np.linspace(0, 10, n_points)
+# Same values as np.linspace(0, 10, n_points), as one scaled float arange
+time = np.arange(n_points, dtype=np.float64) * (10 / (n_points - 1))
+
+# Random generator for the noise segments
+rng = np.random.default_rng()
+
+# Signals are stored as float32, plenty for +-50V test patterns. Time stays
+# float64 so timestamps near 10 s keep their sub-microsecond spacing.
+# Both signals are contiguous rows of one allocation.
+signals = np.zeros((2, n_points), dtype=np.float32)
+A1, A2 = signals
 
 # Generate A1 signal
-A1 = np.zeros(n_points)
 
 # Pulse signal (10000-20000 points)
 pulse_start = 10000
@@ -18,45 +27,47 @@ ramp_start = 30000
 ramp_end = 40000
 ramp_points = ramp_end - ramp_start
 half_ramp = ramp_points // 2
-ramp_up = np.linspace(0, 3, half_ramp)
-ramp_down = np.linspace(3, 0, half_ramp)
-A1[ramp_start:ramp_start+half_ramp] = ramp_up
-A1[ramp_start+half_ramp:ramp_end] = ramp_down
+# 0 -> 3V over the first half and back down over the second, in one store:
+# distance to the nearer end of the ramp is i on the way up, reversed i down
+i = np.arange(ramp_points)
+np.multiply(np.minimum(i, i[::-1]), 3 / (half_ramp - 1), out=A1[ramp_start:ramp_end])
 
 # Random noise around 2V (50000-60000 points)
 noise_start_1 = 50000
 noise_end_1 = 60000
-A1[noise_start_1:noise_end_1] = 2.0 + np.random.uniform(-0.5, 0.5, noise_end_1-noise_start_1)
+A1[noise_start_1:noise_end_1] = 2.0 + rng.uniform(-0.5, 0.5, noise_end_1-noise_start_1)
 
 # Random noise around -2V (70000-80000 points)
 noise_start_2 = 70000
 noise_end_2 = 80000
-A1[noise_start_2:noise_end_2] = -2.0 + np.random.uniform(-0.3, 0.3, noise_end_2-noise_start_2)
+A1[noise_start_2:noise_end_2] = -2.0 + rng.uniform(-0.3, 0.3, noise_end_2-noise_start_2)
 
 # EMP-like waveform (90000-100000 points)
 emp_start = 90000
 emp_end = 100000
 t_emp = np.linspace(0, 1, emp_end-emp_start)
-emp_wave = 10 * np.sin(2*np.pi*5*t_emp) * np.exp(-5*t_emp)
-A1[emp_start:emp_end] = emp_wave
+# 10 * sin(2*pi*5*t) * exp(-5*t), computed in place in A1 with t_emp as scratch
+emp_wave = A1[emp_start:emp_end]
+np.multiply(t_emp, 2*np.pi*5, out=emp_wave)
+np.sin(emp_wave, out=emp_wave)
+emp_wave *= 10
+np.multiply(t_emp, -5, out=t_emp)
+np.exp(t_emp, out=t_emp)
+emp_wave *= t_emp
 
 # Generate A2 signal
-A2 = np.zeros(n_points)
-
 # Square wave from 1s to 9s
 square_start = int(1 * n_points/10)
 square_end = int(9 * n_points/10)
 period = 1000  # points per period
 num_periods = (square_end - square_start) // period
 
-for i in range(num_periods):
-    start_idx = square_start + i * period
-    half_period = period // 2
-    
-    # First half of period: high
-    A2[start_idx:start_idx+half_period] = 10
-    # Second half of period: low 
-    A2[start_idx+half_period:start_idx+period] = -10
+half_period = period // 2
+
+# One row per period: first half high, second half low
+square = A2[square_start:square_start + num_periods*period].reshape(num_periods, period)
+square[:, :half_period] = 10
+square[:, half_period:] = -10
 
 # Add pulse at 9.5-9.6s
 pulse_start = int(9.5 * n_points/10)
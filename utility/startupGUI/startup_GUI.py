@@ -1,3 +1,4 @@
+import functools
 import json
 import tkinter as tk
 from tkinter import ttk
@@ -5,6 +6,41 @@ import subprocess
 import os
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Launched tools get their own process group and no inherited console, so
+# they don't hold up or die with the startup GUI (flags are Windows-only)
+LAUNCH_FLAGS = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+
+@functools.lru_cache(maxsize=None)
+def _wrap_text(text, width):
+    """Add newlines for long text, memoized per (text, width)"""
+    words = text.split()
+    lines = []
+    current_line = []
+    current_len = 0  # len(' '.join(current_line)), kept without re-joining
+    
+    for word in words:
+        added = len(word) + (1 if current_line else 0)
+        if current_len + added > width:
+            if current_line:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_len = len(word)
+            else:
+                lines.append(word)
+        else:
+            current_line.append(word)
+            current_len += added
+    
+    if current_line:
+        lines.append(' '.join(current_line))
+    
+    return '\n'.join(lines)
+
 class StartupGUI:
     def __init__(self, root):
         self.root = root
@@ -13,10 +49,19 @@ class StartupGUI:
         # Configuration variables
         self.BUTTON_FONT_SIZE = 15  # Adjust this value to change font size
         self.BUTTON_WIDTH = 15      # Characters per line for wrapping
+        self.PYTHON_PATH = r"C:\ProgramData\anaconda3\python.exe"  # Interpreter for 'python' items
         
-        # Load config
-        with open('startupGUI_config.json', 'r') as f:
-            self.config = json.load(f)
+        # Load config in one read, parsed with orjson when it is installed and
+        # with json when orjson rejects it (NaN/Infinity literals, a UTF-8 BOM)
+        config_bytes = Path('startupGUI_config.json').read_bytes()
+        self.config = None
+        if orjson is not None:
+            try:
+                self.config = orjson.loads(config_bytes)
+            except orjson.JSONDecodeError:
+                pass
+        if self.config is None:
+            self.config = json.loads(config_bytes)
         
         # Create notebook for tabs
         self.notebook = ttk.Notebook(root)
@@ -42,11 +87,9 @@ class StartupGUI:
             tab_frame = ttk.Frame(self.notebook)
             self.notebook.add(tab_frame, text=tab_name)
             
-            # Configure grid
-            for i in range(4):  # 4 rows
-                tab_frame.grid_rowconfigure(i, weight=1)
-            for i in range(5):  # 5 columns
-                tab_frame.grid_columnconfigure(i, weight=1)
+            # Configure grid, all rows/columns in one Tk call each (Tk takes a list of indices)
+            tab_frame.grid_rowconfigure(tuple(range(4)), weight=1)     # 4 rows
+            tab_frame.grid_columnconfigure(tuple(range(5)), weight=1)  # 5 columns
             
             # Create buttons
             for idx, item in enumerate(items):
@@ -71,33 +114,14 @@ class StartupGUI:
             os.startfile(path)
             
         elif item_type == 'python':
-            anaconda_python = r"C:\ProgramData\anaconda3\python.exe"
-            subprocess.Popen([anaconda_python, path])
+            subprocess.Popen([self.PYTHON_PATH, path], creationflags=LAUNCH_FLAGS)
             
         elif item_type == 'exe':
-            subprocess.Popen([path])
+            subprocess.Popen([path], creationflags=LAUNCH_FLAGS)
 
     def wrap_text(self, text):
         """Helper function to add newlines for long text"""
-        words = text.split()
-        lines = []
-        current_line = []
-        
-        for word in words:
-            current_line.append(word)
-            if len(' '.join(current_line)) > self.BUTTON_WIDTH:
-                if len(current_line) > 1:
-                    current_line.pop()
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    lines.append(word)
-                    current_line = []
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        return '\n'.join(lines)
+        return _wrap_text(text, self.BUTTON_WIDTH)
 
     def on_enter(self, event, button):
         self.style.configure('Fixed.TButton', relief='ridge', borderwidth=2)